@@ -3,65 +3,94 @@ UCB Tutorial - Main Application
 A professional interactive tutorial for understanding the Upper Confidence Bound algorithm
 """
 
+import importlib
+
 import streamlit as st
-from config import APP_CONFIG, STYLES
-from ui_components import setup_page, render_sidebar
-from tabs import (
-    render_primer_tab,
-    render_visual_tab,
-    render_comparison_tab,
-    render_statistical_tab,
-    render_game_tab
+from config import APP_CONFIG, DEFAULT_PARAMS, STYLES_MIN
+from ui_components import setup_page, render_sidebar, keep_sidebar_state, keep_tab_state
+from ucb_core import warmup_kernels
+
+
+# Tab dispatch table: (label, renderer name in ``tabs``, shows sidebar,
+# takes sidebar config). Renderers are resolved lazily so the heavy tab
+# dependencies (pandas, altair, scipy) are only imported once a tab is drawn
+_DISPATCH = (
+    ("📚 UCB Primer", "render_primer_tab", True, False),
+    ("👁️ Visual Simulation", "render_visual_tab", True, True),
+    ("📈 Compare Parameters", "render_comparison_tab", True, True),
+    ("🔬 Statistical Analysis", "render_statistical_tab", True, True),
+    ("🎮 Human vs UCB", "render_game_tab", False, False),  # Game tab has its own settings
 )
+_TAB_LABELS = tuple(record[0] for record in _DISPATCH)
+_DISPATCH_BY_LABEL = {record[0]: record[1:] for record in _DISPATCH}
+
+_HEADER_HTML = """
+<h1>🎯 Upper Confidence Bound (UCB) Tutorial</h1>
+<div class='box info-box'>
+An interactive tutorial to understand how the UCB algorithm balances 
+exploration and exploitation in multi-armed bandit problems.
+</div>
+"""
+
+# Stylesheet and header are static, so they go out as a single element
+_PAGE_HEAD_HTML = STYLES_MIN + "\n" + _HEADER_HTML
+
+
+@st.cache_resource
+def _load_renderer(name: str):
+    """Import the tabs module on first use and return the named renderer"""
+    return getattr(importlib.import_module("tabs"), name)
+
+
+@st.cache_resource(show_spinner="Compiling simulation kernels...")
+def _warmup_kernels() -> bool:
+    """
+    JIT-compile the simulation kernels once per server process
+    
+    Runs before any tab is drawn, so the compile (or the load from numba's
+    on-disk cache after a restart) never lands on a tab's first click for the
+    default ad count.
+    """
+    warmup_kernels(len(DEFAULT_PARAMS["true_ctrs"]))
+    return True
 
 
 def main():
     """Main application entry point"""
-    # Page configuration
-    setup_page()
+    # Page configuration (the frontend keeps it across reruns, so it is
+    # only sent on the first run of each session)
+    if "_page_set" not in st.session_state:
+        setup_page()
+        st.session_state._page_set = True
+    _warmup_kernels()
     
-    # Apply custom styling
-    st.markdown(STYLES, unsafe_allow_html=True)
+    # Custom styling and app header
+    st.markdown(_PAGE_HEAD_HTML, unsafe_allow_html=True)
     
-    # App header
-    st.title("🎯 Upper Confidence Bound (UCB) Tutorial")
-    st.markdown(
-        """
-        <div class='info-box'>
-        An interactive tutorial to understand how the UCB algorithm balances 
-        exploration and exploitation in multi-armed bandit problems.
-        </div>
-        """,
-        unsafe_allow_html=True
+    # Tab selector: a radio styled as tabs, so only the active tab's
+    # body is executed on each rerun
+    active_tab = st.radio(
+        "Tab",
+        _TAB_LABELS,
+        horizontal=True,
+        key="active_tab",
+        label_visibility="collapsed"
     )
     
-    # Render sidebar (only for non-game tabs)
-    sidebar_config = render_sidebar()
-    
-    # Create tabs
-    tabs = st.tabs([
-        "📚 UCB Primer",
-        "👁️ Visual Simulation",
-        "📈 Compare Parameters",
-        "🔬 Statistical Analysis",
-        "🎮 Human vs UCB"
-    ])
-    
-    # Render each tab
-    with tabs[0]:
-        render_primer_tab()
+    renderer, shows_sidebar, takes_config = _DISPATCH_BY_LABEL[active_tab]
     
-    with tabs[1]:
-        render_visual_tab(sidebar_config)
+    # Widgets of tabs that are not drawn this run would lose their values
+    keep_tab_state()
     
-    with tabs[2]:
-        render_comparison_tab(sidebar_config)
-    
-    with tabs[3]:
-        render_statistical_tab(sidebar_config)
+    # Render sidebar (only for non-game tabs)
+    keep_sidebar_state()
+    sidebar_config = render_sidebar() if shows_sidebar else None
     
-    with tabs[4]:
-        render_game_tab()  # Game tab doesn't use sidebar config
+    # Render the active tab
+    if takes_config:
+        _load_renderer(renderer)(sidebar_config)
+    else:
+        _load_renderer(renderer)()
 
 
 if __name__ == "__main__":
@@ -2,6 +2,10 @@
 Configuration and styling for the UCB Tutorial app
 """
 
+import re
+
+import numpy as np
+
 # Application configuration
 APP_CONFIG = {
     "title": "UCB Tutorial & Parameter Selection",
@@ -9,69 +13,104 @@ APP_CONFIG = {
     "initial_sidebar_state": "expanded",
 }
 
+# Default CTRs, built once as a read-only float64 array so consumers can
+# share it across reruns without conversion or defensive copies
+_DEFAULT_CTRS = np.array([0.05, 0.10, 0.20], dtype=np.float64)
+_DEFAULT_CTRS.setflags(write=False)
+
 # Default parameters
 DEFAULT_PARAMS = {
-    "true_ctrs": [0.05, 0.10, 0.20],
+    "true_ctrs": _DEFAULT_CTRS,
     "n_rounds": 500,
     "c_value": 2.0,
     "min_rounds": 50,
     "max_rounds": 20000,
+    "renderer": "vega-lite",
+}
+
+# Chart engines selectable in the sidebar
+CHART_ENGINES = {
+    "vega-lite": "Vega-Lite (raw spec)",
+    "altair": "Altair",
+}
+
+# Color schemes
+COLORS = {
+    "primary": "#667eea",
+    "secondary": "#764ba2",
+    "success": "#2ecc71",
+    "warning": "#f39c12",
+    "danger": "#e74c3c",
+    "info": "#3498db",
 }
 
+# CSS custom properties generated from COLORS, so a palette change only
+# touches COLORS and the rules below reference colors by name
+_CSS_VARIABLES = "    :root {\n" + "".join(
+    f"        --{name}: {value};\n" for name, value in COLORS.items()
+) + "    }\n"
+
 # Styling
 STYLES = """
 <style>
+""" + _CSS_VARIABLES + """
     /* Main container styling */
     .main {
         background-color: #f8f9fa;
     }
     
-    /* Info boxes */
-    .info-box {
+    /* Message boxes: shared base plus color variants */
+    .box {
         padding: 1rem;
         border-radius: 0.5rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        margin: 1rem 0;
+        font-weight: 500;
+    }
+    
+    .info-box {
+        background-color: var(--primary);
         color: white;
-        margin-bottom: 1.5rem;
+        margin: 0 0 1.5rem;
+        font-weight: normal;
         box-shadow: 0 4px 6px rgba(0,0,0,0.1);
     }
     
     .success-box {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
+        background-color: #84fab0;
         color: #1e3a8a;
-        margin: 1rem 0;
-        font-weight: 500;
     }
     
     .warning-box {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%);
+        background-color: #ffeaa7;
         color: #854d0e;
-        margin: 1rem 0;
-        font-weight: 500;
     }
     
-    /* Ad display boxes */
-    .ad-box-selected {
-        border: 3px solid #2ecc71;
+    /* Ad display boxes: one flex row of equal-width boxes */
+    .ad-row {
+        display: flex;
+        gap: 1rem;
+    }
+    
+    .ad-row .ad-box {
+        flex: 1;
+    }
+    
+    .ad-box {
         padding: 15px;
         border-radius: 10px;
         text-align: center;
-        background: linear-gradient(135deg, #f0fff5 0%, #e8f5e9 100%);
+    }
+    
+    .ad-box-selected {
+        border: 3px solid var(--success);
+        background-color: #f0fff5;
         box-shadow: 0 4px 12px rgba(46, 204, 113, 0.3);
-        transition: all 0.3s ease;
     }
     
     .ad-box-idle {
         border: 1px solid #e0e0e0;
-        padding: 15px;
-        border-radius: 10px;
-        text-align: center;
         background: #fafafa;
-        transition: all 0.3s ease;
+        transition: background-color 0.2s, border-color 0.2s;
     }
     
     .ad-box-idle:hover {
@@ -92,7 +131,7 @@ STYLES = """
         width: 100%;
         border-radius: 8px;
         font-weight: 600;
-        transition: all 0.3s ease;
+        transition: transform 0.2s, box-shadow 0.2s;
     }
     
     .stButton>button:hover {
@@ -111,12 +150,12 @@ STYLES = """
     }
     
     .user-score {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background-color: var(--primary);
         color: white;
     }
     
     .ucb-score {
-        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        background-color: #f5576c;
         color: white;
     }
     
@@ -134,25 +173,40 @@ STYLES = """
         overflow: hidden;
     }
     
-    /* Tabs styling */
-    .stTabs [data-baseweb="tab-list"] {
+    /* Tab selector (horizontal radio styled as tabs) */
+    .st-key-active_tab div[role="radiogroup"] {
         gap: 8px;
+        border-bottom: 1px solid #e0e0e0;
+        margin-bottom: 1rem;
     }
     
-    .stTabs [data-baseweb="tab"] {
+    .st-key-active_tab div[role="radiogroup"] > label {
         border-radius: 8px 8px 0 0;
         padding: 10px 20px;
+        margin: 0;
         font-weight: 600;
     }
+    
+    .st-key-active_tab div[role="radiogroup"] > label > div:first-child {
+        display: none;
+    }
+    
+    .st-key-active_tab div[role="radiogroup"] > label:has(input:checked) {
+        border-bottom: 3px solid var(--primary);
+        color: var(--primary);
+    }
 </style>
 """
 
-# Color schemes
-COLORS = {
-    "primary": "#667eea",
-    "secondary": "#764ba2",
-    "success": "#2ecc71",
-    "warning": "#f39c12",
-    "danger": "#e74c3c",
-    "info": "#3498db",
-}
+
+def _minify_css(css: str) -> str:
+    """Strip comments, whitespace and redundant semicolons from a CSS block"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,])\s*", r"\1", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+# Minified once at import; this is what gets sent to the browser on each rerun
+STYLES_MIN = _minify_css(STYLES)
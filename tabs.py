@@ -7,17 +7,268 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import altair as alt
-from scipy import stats
+import math
 import time
-import itertools
 
-from ucb_algorithm import UCBAgent, simulate_ucb_episode, run_multiple_simulations, get_optimal_ctr
+from ucb_algorithm import (
+    UCBAgent, advance_agent, run_multiple_simulations,
+    run_multiple_simulations_batched, get_optimal_ctr
+)
 from ui_components import (
     render_ad_boxes, render_stats_panel, render_formula_explanation,
     show_success_message, show_warning_message, render_game_scores
 )
 
 
+# Server-wide caches shared by every session: keep only the most recent runs
+# (a trajectory set can run to several MB)
+TRAJECTORY_CACHE_ENTRIES = 16
+SIMULATION_CACHE_ENTRIES = 64
+
+
+def _learning_curves_spec(
+    sample_df: pd.DataFrame,
+    mean_data: pd.DataFrame,
+    optimal_ctr: float
+) -> dict:
+    """
+    Build the learning-curve chart as a raw Vega-Lite spec
+    
+    Same layers as the Altair version (faded runs, bold means, optimal
+    rule), but skips Altair's object model and schema validation. Data is
+    passed as named datasets so Streamlit ships it as Arrow.
+    
+    Args:
+        sample_df: Sampled per-run trajectories (c, run, round, avg_ctr)
+        mean_data: Mean trajectory per c value (c, round, avg_ctr)
+        optimal_ctr: CTR of always choosing the best ad
+        
+    Returns:
+        Vega-Lite spec dictionary
+    """
+    color = {"field": "c", "type": "nominal", "title": "c value"}
+    return {
+        "height": 400,
+        "datasets": {
+            "runs": sample_df,
+            "means": mean_data,
+            "optimal": pd.DataFrame({"y": [optimal_ctr]}),
+        },
+        "layer": [
+            {
+                "data": {"name": "runs"},
+                "mark": {"type": "line", "opacity": 0.1, "strokeWidth": 1},
+                "encoding": {
+                    "x": {"field": "round", "type": "quantitative", "title": "Round"},
+                    "y": {"field": "avg_ctr", "type": "quantitative", "title": "Average CTR"},
+                    "detail": {"field": "run", "type": "nominal"},
+                    "color": color,
+                },
+                "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+            },
+            {
+                "data": {"name": "means"},
+                "mark": {"type": "line", "strokeWidth": 3},
+                "encoding": {
+                    "x": {"field": "round", "type": "quantitative"},
+                    "y": {"field": "avg_ctr", "type": "quantitative"},
+                    "color": color,
+                    "tooltip": [
+                        {"field": "c", "type": "nominal"},
+                        {"field": "round", "type": "quantitative"},
+                        {"field": "avg_ctr", "type": "quantitative"},
+                    ],
+                },
+            },
+            {
+                "data": {"name": "optimal"},
+                "mark": {"type": "rule", "strokeDash": [5, 5], "color": "red", "strokeWidth": 2},
+                "encoding": {"y": {"field": "y", "type": "quantitative"}},
+            },
+        ],
+    }
+
+
+# Same bound as the trajectory cache the charts are built from
+@st.cache_resource(show_spinner=False, max_entries=TRAJECTORY_CACHE_ENTRIES)
+def _learning_curves_chart(
+    key: tuple,
+    optimal_ctr: float,
+    _sample_df: pd.DataFrame,
+    _mean_data: pd.DataFrame
+) -> alt.LayerChart:
+    """
+    Build the Altair learning-curve chart, reused across reruns
+    
+    The frames are excluded from hashing; key identifies the comparison
+    run that produced them.
+    """
+    # Individual traces (faded)
+    individual = alt.Chart(_sample_df).mark_line(
+        opacity=0.1,
+        strokeWidth=1
+    ).encode(
+        x=alt.X("round:Q", title="Round"),
+        y=alt.Y("avg_ctr:Q", title="Average CTR"),
+        detail="run:N",
+        color=alt.Color("c:N", title="c value")
+    )
+    
+    # Mean lines (bold)
+    mean_lines = alt.Chart(_mean_data).mark_line(
+        strokeWidth=3
+    ).encode(
+        x="round:Q",
+        y="avg_ctr:Q",
+        color=alt.Color("c:N", title="c value"),
+        tooltip=["c:N", "round:Q", "avg_ctr:Q"]
+    )
+    
+    # Optimal CTR reference line
+    optimal_line = alt.Chart(pd.DataFrame({"y": [optimal_ctr]})).mark_rule(
+        strokeDash=[5, 5],
+        color="red",
+        strokeWidth=2
+    ).encode(y="y:Q")
+    
+    return (individual + mean_lines + optimal_line).properties(
+        height=400
+    ).interactive()
+
+
+def _boxplot_spec(box_df: pd.DataFrame) -> dict:
+    """
+    Build the CTR-distribution box plot as a raw Vega-Lite spec
+    
+    Draws from precomputed five-number summaries (c, q0..q4), one row per
+    c value: a rule for the min-max whiskers, a bar for the IQR and a tick
+    for the median.
+    """
+    x = {"field": "c", "type": "quantitative", "title": "c value"}
+    color = {"field": "c", "type": "quantitative", "legend": None}
+    return {
+        "height": 350,
+        "datasets": {"boxes": box_df},
+        "data": {"name": "boxes"},
+        "layer": [
+            {
+                "mark": "rule",
+                "encoding": {
+                    "x": x,
+                    "y": {"field": "q0", "type": "quantitative", "title": "Average CTR"},
+                    "y2": {"field": "q4"},
+                    "color": color,
+                },
+            },
+            {
+                "mark": {"type": "bar", "size": 50},
+                "encoding": {
+                    "x": x,
+                    "y": {"field": "q1", "type": "quantitative"},
+                    "y2": {"field": "q3"},
+                    "color": color,
+                },
+            },
+            {
+                "mark": {"type": "tick", "size": 50, "color": "white", "orient": "horizontal"},
+                "encoding": {"x": x, "y": {"field": "q2", "type": "quantitative"}},
+            },
+        ],
+    }
+
+
+# Upper bound of the visual tab's rounds input; its history arrays are sized to it
+VISUAL_MAX_ROUNDS = 1000
+
+
+def _new_visual_state(n_arms: int, c: float, rng: np.random.Generator) -> dict:
+    """Fresh visual-simulation state with preallocated per-round history"""
+    return {
+        "round": 0,
+        "agent": UCBAgent(n_arms, c),
+        "total_clicks": 0,
+        "actions": np.empty(VISUAL_MAX_ROUNDS, dtype=np.int32),
+        "rewards": np.empty(VISUAL_MAX_ROUNDS, dtype=np.int8),
+        # Every round's reward draw, made up front and consumed in order
+        "coins": rng.random(VISUAL_MAX_ROUNDS),
+        "last": None
+    }
+
+
+def _new_game_state(rng: np.random.Generator, max_rounds: int = 30, k: int = 3) -> dict:
+    """Fresh human-vs-UCB game with new hidden CTRs"""
+    return {
+        "round": 0,
+        "max_rounds": max_rounds,
+        "true_ctrs": sorted(rng.uniform(0.05, 0.30, k).tolist()),  # HIDDEN!
+        "c_param": 2.0,
+        "ucb_agent": UCBAgent(k, 2.0),
+        "user_Q": [0.0] * k,
+        "user_N": [0] * k,
+        "user_actions": np.empty(max_rounds, dtype=np.int8),
+        "user_rewards": np.zeros(max_rounds, dtype=np.bool_),
+        "ucb_actions": np.empty(max_rounds, dtype=np.int8),
+        "ucb_rewards": np.zeros(max_rounds, dtype=np.bool_),
+        # Reward draws for every round, for the player (column 0) and UCB (column 1)
+        "coins": rng.random((max_rounds, 2)),
+        "game_over": False
+    }
+
+
+def _agent_snapshot(agent: UCBAgent, action: int, reward: int) -> dict:
+    """State of the agent right after its latest round, for display"""
+    return {
+        "action": int(action),
+        "reward": int(reward),
+        "Q": agent.Q.copy(),
+        "N": agent.N.copy(),
+        "ucb": agent.get_ucb_values(),
+        # Exploitation means the chosen ad is the one with the highest estimate
+        "is_exploit": int(action) == int(np.argmax(agent.Q))
+    }
+
+
+def _seed_widget_state(defaults: dict) -> None:
+    """Give tab widgets their initial values the first time the tab is drawn"""
+    for key, value in defaults.items():
+        st.session_state.setdefault(key, value)
+
+
+def _session_rng() -> np.random.Generator:
+    """Random generator shared by all tabs for the current session"""
+    if "rng" not in st.session_state:
+        st.session_state.rng = np.random.default_rng()
+    return st.session_state.rng
+
+
+@st.cache_data(show_spinner=False, max_entries=TRAJECTORY_CACHE_ENTRIES)
+def _cached_trajectories(
+    true_ctrs: tuple,
+    n_rounds: int,
+    c_values: tuple,
+    n_runs: int,
+    seed: int
+) -> np.ndarray:
+    """Comparison-tab trajectories, memoized on the simulation inputs"""
+    return run_multiple_simulations_batched(
+        list(true_ctrs), n_rounds, list(c_values), n_runs, rng=np.random.default_rng(seed)
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=SIMULATION_CACHE_ENTRIES)
+def _cached_simulations(
+    true_ctrs: tuple,
+    n_rounds: int,
+    c_values: tuple,
+    n_runs: int,
+    seed: int
+) -> dict:
+    """Statistical-tab average CTRs, memoized on the simulation inputs"""
+    return run_multiple_simulations(
+        list(true_ctrs), n_rounds, list(c_values), n_runs, rng=np.random.default_rng(seed)
+    )
+
+
 def render_primer_tab():
     """Render the UCB primer/introduction tab"""
     st.header("📚 Upper Confidence Bound (UCB) Algorithm Primer")
@@ -75,25 +326,28 @@ def render_primer_tab():
     st.subheader("💡 Interactive Example: Incremental Updates")
     st.markdown("See how estimated CTR (Q) converges to the true value through incremental updates:")
     
-    true_ctr_example = st.slider("True CTR of the ad", 0.0, 1.0, 0.20, 0.05)
-    n_impressions = st.slider("Number of impressions to simulate", 5, 50, 10)
+    _seed_widget_state({"primer_true_ctr": 0.20, "primer_n_impressions": 10})
+    true_ctr_example = st.slider(
+        "True CTR of the ad", 0.0, 1.0, step=0.05, key="primer_true_ctr"
+    )
+    n_impressions = st.slider(
+        "Number of impressions to simulate", 5, 50, key="primer_n_impressions"
+    )
     
     if st.button("🎲 Simulate Random Clicks"):
         # Generate random clicks based on true CTR
-        clicks = (np.random.rand(n_impressions) < true_ctr_example).astype(int)
-        
-        Q = 0.0
-        table_data = []
-        for i, r in enumerate(clicks, start=1):
-            N = i
-            Q = Q + (r - Q) / N
-            table_data.append({
-                "Impression": i,
-                "Click?": "✅" if r == 1 else "❌",
-                "Estimated CTR (Q)": round(Q, 4)
-            })
-        
-        df = pd.DataFrame(table_data)
+        clicks = (_session_rng().random(n_impressions) < true_ctr_example).astype(np.int8)
+        
+        # Running mean of the clicks is exactly the incremental update
+        # Q <- Q + (r - Q) / N applied impression by impression
+        N = np.arange(1, n_impressions + 1)
+        Q = np.cumsum(clicks) / N
+        
+        df = pd.DataFrame({
+            "Impression": N,
+            "Click?": np.where(clicks == 1, "✅", "❌"),
+            "Estimated CTR (Q)": np.round(Q, 4)
+        })
         st.dataframe(df, use_container_width=True)
         
         final_q = df.iloc[-1]["Estimated CTR (Q)"]
@@ -114,39 +368,45 @@ def render_visual_tab(config: dict):
     st.header("👁️ Visual Step-by-Step Simulation")
     st.markdown("Watch how UCB explores and exploits to find the best ad!")
     
+    ctrs = config["true_ctrs"]
+    k = len(ctrs)
+    
     col_left, col_right = st.columns([2, 1])
     
     with col_right:
         st.subheader("⚙️ Settings")
+        _seed_widget_state({
+            "visual_n_rounds": min(50, config["n_rounds"]),
+            "visual_c": 2.0
+        })
         n_rounds = st.number_input(
             "Rounds (impressions)",
             min_value=10,
-            max_value=1000,
-            value=min(50, config["n_rounds"]),
-            help="Number of rounds to simulate"
+            max_value=VISUAL_MAX_ROUNDS,
+            help="Number of rounds to simulate",
+            key="visual_n_rounds"
         )
         c = st.number_input(
             "Exploration parameter (c)",
             min_value=0.0,
             max_value=10.0,
-            value=2.0,
             step=0.1,
             format="%.2f",
-            help="Higher values encourage more exploration"
+            help="Higher values encourage more exploration",
+            key="visual_c"
         )
         
         st.markdown("**True CTRs:**")
-        for i, ctr in enumerate(config["true_ctrs"]):
+        for i, ctr in enumerate(ctrs):
             st.markdown(f"- Ad {i+1}: {ctr:.3f}")
     
-    # Initialize session state for interactive simulation
-    if "visual_state" not in st.session_state:
-        st.session_state.visual_state = {
-            "round": 0,
-            "agent": UCBAgent(len(config["true_ctrs"]), c),
-            "clicks": [],
-            "history": []
-        }
+    # Initialize session state for interactive simulation; start over when
+    # the sidebar CTRs change the number of ads under the current agent
+    if (
+        "visual_state" not in st.session_state
+        or st.session_state.visual_state["agent"].n_arms != k
+    ):
+        st.session_state.visual_state = _new_visual_state(k, c, _session_rng())
     
     state = st.session_state.visual_state
     
@@ -155,54 +415,44 @@ def render_visual_tab(config: dict):
     with col_btn1:
         if st.button("▶️ Next Round"):
             if state["round"] < n_rounds:
-                state["round"] += 1
+                t = state["round"]
                 action = state["agent"].select_action()
-                reward = int(np.random.rand() < config["true_ctrs"][action])
+                reward = int(state["coins"][t] < ctrs[action])
                 state["agent"].update(action, reward)
-                state["clicks"].append(reward)
-                state["history"].append({
-                    "action": action,
-                    "reward": reward,
-                    "Q": state["agent"].Q.copy(),
-                    "N": state["agent"].N.copy(),
-                    "ucb": state["agent"].get_ucb_values().copy()
-                })
+                state["total_clicks"] += reward
+                state["actions"][t] = action
+                state["rewards"][t] = reward
+                state["round"] = t + 1
+                state["last"] = _agent_snapshot(state["agent"], action, reward)
     
     with col_btn2:
         if st.button("⏩ Auto-play Remaining"):
             with st.spinner("Running simulation..."):
-                while state["round"] < n_rounds:
-                    state["round"] += 1
-                    action = state["agent"].select_action()
-                    reward = int(np.random.rand() < config["true_ctrs"][action])
-                    state["agent"].update(action, reward)
-                    state["clicks"].append(reward)
-                    state["history"].append({
-                        "action": action,
-                        "reward": reward,
-                        "Q": state["agent"].Q.copy(),
-                        "N": state["agent"].N.copy(),
-                        "ucb": state["agent"].get_ucb_values().copy()
-                    })
+                remaining = n_rounds - state["round"]
+                if remaining > 0:
+                    t0 = state["round"]
+                    actions, rewards = advance_agent(
+                        state["agent"], ctrs, remaining, coins=state["coins"][t0:n_rounds]
+                    )
+                    state["total_clicks"] += int(rewards.sum())
+                    state["actions"][t0:n_rounds] = actions
+                    state["rewards"][t0:n_rounds] = rewards
+                    state["round"] = n_rounds
+                    state["last"] = _agent_snapshot(state["agent"], actions[-1], rewards[-1])
                 show_success_message("Simulation complete!")
     
     with col_btn3:
         if st.button("🔄 Reset"):
-            st.session_state.visual_state = {
-                "round": 0,
-                "agent": UCBAgent(len(config["true_ctrs"]), c),
-                "clicks": [],
-                "history": []
-            }
+            st.session_state.visual_state = _new_visual_state(k, c, _session_rng())
             st.rerun()
     
     # Display current state
     st.subheader(f"Round {state['round']}/{n_rounds}")
     
     if state["round"] > 0:
-        last = state["history"][-1]
+        last = state["last"]
         render_ad_boxes(
-            len(config["true_ctrs"]),
+            k,
             selected_ad=last["action"],
             reward=last["reward"]
         )
@@ -214,23 +464,21 @@ def render_visual_tab(config: dict):
         
         with col_a:
             st.markdown("### 📊 Current Estimates")
-            for i in range(len(config["true_ctrs"])):
+            # Python floats, so the per-ad formatting skips NumPy scalar calls
+            Q, N, ucb = last["Q"].tolist(), last["N"].tolist(), last["ucb"].tolist()
+            for i in range(k):
                 selected = " ← **Selected**" if i == last["action"] else ""
-                ucb_display = f"{last['ucb'][i]:.4f}" if not np.isinf(last['ucb'][i]) else "∞"
+                ucb_display = f"{ucb[i]:.4f}" if not math.isinf(ucb[i]) else "∞"
                 st.markdown(f"""
                 **Ad {i+1}**{selected}
-                - Estimated CTR (Q): {last['Q'][i]:.4f}
-                - Times shown (N): {int(last['N'][i])}
+                - Estimated CTR (Q): {Q[i]:.4f}
+                - Times shown (N): {int(N[i])}
                 - UCB value: {ucb_display}
                 """)
         
         with col_b:
             st.markdown("### 🎯 Why this ad?")
-            action = last["action"]
-            
-            # Determine if exploration or exploitation
-            max_q_idx = np.argmax(last["Q"])
-            if action == max_q_idx:
+            if last["is_exploit"]:
                 reason = "**Exploitation**"
                 explanation = "This ad has the highest estimated CTR"
             else:
@@ -242,15 +490,16 @@ def render_visual_tab(config: dict):
             
             {explanation}
             
-            **Average CTR so far:** {sum(state['clicks']) / state['round']:.4f}
+            **Average CTR so far:** {state['total_clicks'] / state['round']:.4f}
             """)
     else:
-        render_ad_boxes(len(config["true_ctrs"]))
+        render_ad_boxes(k)
         st.info("👆 Click 'Next Round' to start the simulation!")
     
     # Progress indicator
     if state["round"] > 0:
-        progress = state["round"] / n_rounds
+        # The rounds input can be lowered below the rounds already played
+        progress = min(state["round"] / n_rounds, 1.0)
         st.progress(progress)
 
 
@@ -263,52 +512,75 @@ def render_comparison_tab(config: dict):
     
     with col_right:
         st.subheader("⚙️ Settings")
+        _seed_widget_state({
+            "comparison_n_rounds": min(500, config["n_rounds"]),
+            "comparison_c_values": "0.1,0.5,1.0,2.0,4.0",
+            "comparison_n_runs": 10,
+            "comparison_seed": 0
+        })
         n_rounds_comp = st.number_input(
             "Rounds for comparison",
             min_value=50,
             max_value=5000,
-            value=min(500, config["n_rounds"]),
-            step=50
+            step=50,
+            key="comparison_n_rounds"
         )
         c_list_input = st.text_input(
             "c values (comma-separated)",
-            "0.1,0.5,1.0,2.0,4.0",
-            help="List of exploration parameters to compare"
+            help="List of exploration parameters to compare",
+            key="comparison_c_values"
         )
         n_runs_comp = st.number_input(
             "Runs per c (for averaging)",
             min_value=1,
             max_value=50,
-            value=10
+            key="comparison_n_runs"
+        )
+        seed_comp = st.number_input(
+            "Random seed",
+            min_value=0,
+            step=1,
+            help="Same settings and seed reproduce the previous results instantly",
+            key="comparison_seed"
         )
         
         if st.button("📈 Run Comparison"):
             try:
-                c_list = sorted([float(x.strip()) for x in c_list_input.split(",") if x.strip()])
+                # Unique values only: the per-c mean curves are labelled by c
+                c_list = sorted({float(x.strip()) for x in c_list_input.split(",") if x.strip()})
                 
                 with st.spinner("Running simulations..."):
-                    progress_bar = st.progress(0.0)
-                    
-                    # Collect trajectories
-                    all_data = []
-                    for i, c in enumerate(c_list):
-                        for run in range(n_runs_comp):
-                            _, trajectory = simulate_ucb_episode(
-                                config["true_ctrs"],
-                                n_rounds_comp,
-                                c,
-                                return_trajectory=True
-                            )
-                            for t, ctr in enumerate(trajectory, 1):
-                                all_data.append({
-                                    "c": float(c),
-                                    "run": run + 1,
-                                    "round": t,
-                                    "avg_ctr": float(ctr)
-                                })
-                        progress_bar.progress((i + 1) / len(c_list))
+                    # Trajectories for every (c, run) pair in one batched call
+                    trajectories = _cached_trajectories(
+                        tuple(config["true_ctrs"].tolist()),
+                        n_rounds_comp,
+                        tuple(c_list),
+                        n_runs_comp,
+                        seed_comp
+                    )
                     
-                    st.session_state["comparison_data"] = pd.DataFrame(all_data)
+                    # Flatten to long format; rows are ordered (c, run, round)
+                    n_c = len(c_list)
+                    df = pd.DataFrame({
+                        "c": np.repeat(np.asarray(c_list, dtype=np.float64), n_runs_comp * n_rounds_comp),
+                        "run": np.tile(np.repeat(np.arange(1, n_runs_comp + 1), n_rounds_comp), n_c),
+                        "round": np.tile(np.arange(1, n_rounds_comp + 1), n_c * n_runs_comp),
+                        "avg_ctr": trajectories.ravel()
+                    })
+                    st.session_state["comparison_data"] = df
+                    st.session_state["comparison_key"] = (
+                        tuple(config["true_ctrs"].tolist()), n_rounds_comp, tuple(c_list), n_runs_comp, seed_comp
+                    )
+                    # Faded traces show a fixed sample, drawn once rather than per rerun
+                    st.session_state["comparison_sample"] = df.sample(
+                        min(len(df), 1000), random_state=0
+                    ).reset_index(drop=True)
+                    # Mean curve per c, computed once here rather than on every rerun
+                    st.session_state["comparison_means"] = pd.DataFrame({
+                        "c": np.repeat(np.asarray(c_list, dtype=np.float64), n_rounds_comp),
+                        "round": np.tile(np.arange(1, n_rounds_comp + 1), n_c),
+                        "avg_ctr": trajectories.mean(axis=1, dtype=np.float64).astype(np.float32).ravel()
+                    })
                     show_success_message("Comparison complete!")
                     
             except ValueError:
@@ -322,42 +594,21 @@ def render_comparison_tab(config: dict):
             st.subheader("📊 Learning Curves")
             
             # Create visualizations
-            mean_data = df.groupby(["c", "round"], as_index=False)["avg_ctr"].mean()
+            mean_data = st.session_state["comparison_means"]
             
-            # Individual traces (faded)
-            individual = alt.Chart(df.sample(min(len(df), 1000))).mark_line(
-                opacity=0.1,
-                strokeWidth=1
-            ).encode(
-                x=alt.X("round:Q", title="Round"),
-                y=alt.Y("avg_ctr:Q", title="Average CTR"),
-                detail="run:N",
-                color=alt.Color("c:N", title="c value")
-            )
-            
-            # Mean lines (bold)
-            mean_lines = alt.Chart(mean_data).mark_line(
-                strokeWidth=3
-            ).encode(
-                x="round:Q",
-                y="avg_ctr:Q",
-                color=alt.Color("c:N", title="c value"),
-                tooltip=["c:N", "round:Q", "avg_ctr:Q"]
-            )
-            
-            # Optimal CTR reference line
+            sample_df = st.session_state["comparison_sample"]
             optimal_ctr = get_optimal_ctr(config["true_ctrs"])
-            optimal_line = alt.Chart(pd.DataFrame({"y": [optimal_ctr]})).mark_rule(
-                strokeDash=[5, 5],
-                color="red",
-                strokeWidth=2
-            ).encode(y="y:Q")
             
-            chart = (individual + mean_lines + optimal_line).properties(
-                height=400
-            ).interactive()
-            
-            st.altair_chart(chart, use_container_width=True)
+            if config["renderer"] == "vega-lite":
+                st.vega_lite_chart(
+                    spec=_learning_curves_spec(sample_df, mean_data, optimal_ctr),
+                    use_container_width=True
+                )
+            else:
+                chart = _learning_curves_chart(
+                    st.session_state["comparison_key"], optimal_ctr, sample_df, mean_data
+                )
+                st.altair_chart(chart, use_container_width=True)
             
             st.markdown(f"""
             **Red dashed line:** Optimal CTR ({optimal_ctr:.3f}) - achieved by always choosing the best ad
@@ -384,6 +635,9 @@ def render_comparison_tab(config: dict):
 
 def render_statistical_tab(config: dict):
     """Render the statistical analysis tab"""
+    # scipy is only needed here; importing it lazily keeps it off the other tabs' path
+    from scipy import stats
+    
     st.header("🔬 Statistical Analysis: Finding the Best c")
     st.markdown("""
     Run rigorous statistical tests to determine which exploration parameter performs best.
@@ -394,31 +648,45 @@ def render_statistical_tab(config: dict):
     
     with col2:
         st.subheader("⚙️ Settings")
+        _seed_widget_state({
+            "stat_n_rounds": min(500, config["n_rounds"]),
+            "stat_c_values": "0.1,0.5,1.0,2.0,4.0",
+            "stat_n_runs": 30,
+            "stat_alpha": 0.05,
+            "stat_seed": 0
+        })
         n_rounds_stat = st.number_input(
             "Rounds per simulation",
             min_value=50,
             max_value=5000,
-            value=min(500, config["n_rounds"])
+            key="stat_n_rounds"
         )
         c_values_text = st.text_input(
             "c values to test",
-            "0.1,0.5,1.0,2.0,4.0"
+            key="stat_c_values"
         )
         n_runs_stat = st.number_input(
             "Simulations per c",
             min_value=10,
             max_value=200,
-            value=30,
-            help="More simulations = more reliable results"
+            help="More simulations = more reliable results",
+            key="stat_n_runs"
         )
         
         alpha = st.number_input(
             "Significance level (α)",
             min_value=0.01,
             max_value=0.10,
-            value=0.05,
             step=0.01,
-            help="Probability threshold for statistical significance"
+            help="Probability threshold for statistical significance",
+            key="stat_alpha"
+        )
+        seed_stat = st.number_input(
+            "Random seed",
+            min_value=0,
+            step=1,
+            help="Same settings and seed reproduce the previous results instantly",
+            key="stat_seed"
         )
         
         if st.button("🔬 Run Statistical Analysis"):
@@ -426,11 +694,12 @@ def render_statistical_tab(config: dict):
                 c_values = [float(x.strip()) for x in c_values_text.split(",") if x.strip()]
                 
                 with st.spinner("Running simulations and statistical tests..."):
-                    results = run_multiple_simulations(
-                        config["true_ctrs"],
+                    results = _cached_simulations(
+                        tuple(config["true_ctrs"].tolist()),
                         n_rounds_stat,
-                        c_values,
-                        n_runs_stat
+                        tuple(c_values),
+                        n_runs_stat,
+                        seed_stat
                     )
                     
                     st.session_state["stat_results"] = {
@@ -452,43 +721,63 @@ def render_statistical_tab(config: dict):
         c_values = data["c_values"]
         alpha = data["alpha"]
         
+        # Per-group moments and quantiles feed the box plot, the summary
+        # table and every test below
+        groups = np.array([results[c] for c in c_values])
+        ns = np.full(len(c_values), groups.shape[1])
+        means = groups.mean(axis=1)
+        vars_ = groups.var(axis=1, ddof=1)
+        quantiles = np.quantile(groups, [0.0, 0.25, 0.5, 0.75, 1.0], axis=1)
+        
         with col1:
-            # Box plot
+            # Box plot, drawn from the five-number summary of each c value
             st.subheader("📦 Distribution of CTRs")
-            df_long = pd.DataFrame([
-                {"c": c, "avg_ctr": ctr}
-                for c, ctrs in results.items()
-                for ctr in ctrs
-            ])
+            box_df = pd.DataFrame({"c": c_values})
+            for i, q in enumerate(quantiles):
+                box_df[f"q{i}"] = q
             
-            box_chart = alt.Chart(df_long).mark_boxplot(size=50).encode(
-                x=alt.X("c:Q", title="c value"),
-                y=alt.Y("avg_ctr:Q", title="Average CTR"),
-                color=alt.Color("c:Q", legend=None)
-            ).properties(height=350)
-            
-            st.altair_chart(box_chart, use_container_width=True)
+            if config["renderer"] == "vega-lite":
+                st.vega_lite_chart(spec=_boxplot_spec(box_df), use_container_width=True)
+            else:
+                base = alt.Chart(box_df).encode(
+                    x=alt.X("c:Q", title="c value"),
+                    color=alt.Color("c:Q", legend=None)
+                )
+                whiskers = base.mark_rule().encode(
+                    y=alt.Y("q0:Q", title="Average CTR"),
+                    y2="q4:Q"
+                )
+                boxes = base.mark_bar(size=50).encode(y="q1:Q", y2="q3:Q")
+                medians = alt.Chart(box_df).mark_tick(
+                    size=50, color="white", orient="horizontal"
+                ).encode(x="c:Q", y="q2:Q")
+                box_chart = (whiskers + boxes + medians).properties(height=350)
+                
+                st.altair_chart(box_chart, use_container_width=True)
         
         # Summary statistics
         st.subheader("📊 Summary Statistics")
-        summary_data = []
-        for c in c_values:
-            ctrs = results[c]
-            summary_data.append({
-                "c": c,
-                "mean": np.mean(ctrs),
-                "std": np.std(ctrs),
-                "min": np.min(ctrs),
-                "max": np.max(ctrs),
-                "n": len(ctrs)
-            })
-        summary_df = pd.DataFrame(summary_data).round(4)
+        summary_df = pd.DataFrame({
+            "c": c_values,
+            "mean": means,
+            "std": groups.std(axis=1),
+            "min": quantiles[0],
+            "max": quantiles[4],
+            "n": ns
+        }).round(4)
         st.dataframe(summary_df, use_container_width=True)
         
         # ANOVA test
         st.subheader("🧪 ANOVA Test")
-        groups = [results[c] for c in c_values]
-        f_stat, p_val = stats.f_oneway(*groups)
+        n_total = ns.sum()
+        df_between = len(c_values) - 1
+        df_within = n_total - len(c_values)
+        grand_mean = (ns * means).sum() / n_total
+        ss_between = (ns * (means - grand_mean) ** 2).sum()
+        ss_within = ((ns - 1) * vars_).sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f_stat = (ss_between / df_between) / (ss_within / df_within)
+        p_val = stats.f.sf(f_stat, df_between, df_within)
         
         st.markdown(f"""
         **Null Hypothesis:** All c values have the same mean performance  
@@ -504,38 +793,39 @@ def render_statistical_tab(config: dict):
             # Pairwise comparisons
             st.subheader("🔍 Pairwise T-Tests (Bonferroni corrected)")
             
-            pairs = list(itertools.combinations(c_values, 2))
-            n_comparisons = len(pairs)
+            # Pooled-variance t-tests for every pair at once
+            i, j = np.triu_indices(len(c_values), k=1)
+            n_comparisons = len(i)
             bonferroni_alpha = alpha / n_comparisons
             
-            comparison_data = []
-            for c1, c2 in pairs:
-                t_stat, p = stats.ttest_ind(results[c1], results[c2])
-                mean_diff = np.mean(results[c1]) - np.mean(results[c2])
-                significant = p < bonferroni_alpha
-                
-                comparison_data.append({
-                    "c1": c1,
-                    "c2": c2,
-                    "mean_diff": round(mean_diff, 5),
-                    "t_statistic": round(t_stat, 4),
-                    "p_value": f"{p:.6f}",
-                    "significant": "✅" if significant else "❌"
-                })
+            mean_diff = means[i] - means[j]
+            dof = ns[i] + ns[j] - 2
+            pooled_var = ((ns[i] - 1) * vars_[i] + (ns[j] - 1) * vars_[j]) / dof
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_stat = mean_diff / np.sqrt(pooled_var * (1 / ns[i] + 1 / ns[j]))
+            p = 2 * stats.t.sf(np.abs(t_stat), dof)
             
-            comp_df = pd.DataFrame(comparison_data)
+            c_arr = np.asarray(c_values)
+            comp_df = pd.DataFrame({
+                "c1": c_arr[i],
+                "c2": c_arr[j],
+                "mean_diff": mean_diff.round(5),
+                "t_statistic": t_stat.round(4),
+                "p_value": [f"{x:.6f}" for x in p],
+                "significant": np.where(p < bonferroni_alpha, "✅", "❌")
+            })
             st.dataframe(comp_df, use_container_width=True)
             
             st.markdown(f"*Bonferroni-corrected α = {bonferroni_alpha:.6f}*")
             
             # Find best c
-            best_c = max(c_values, key=lambda c: np.mean(results[c]))
-            best_mean = np.mean(results[best_c])
+            best = int(np.argmax(means))
+            best_c, best_mean = c_values[best], means[best]
             
             st.markdown("---")
             st.markdown(
                 f"""
-                <div class='success-box'>
+                <div class='box success-box'>
                 <h3>🏆 Best Performing Parameter</h3>
                 <p><strong>c = {best_c}</strong></p>
                 <p>Mean CTR: {best_mean:.4f}</p>
@@ -554,7 +844,7 @@ def render_game_tab():
     st.header("🎮 Human vs UCB Challenge")
     
     st.markdown("""
-    <div class='info-box'>
+    <div class='box info-box'>
     <h3>🎯 Game Rules</h3>
     <ul>
     <li>There are 3 ads with <strong>hidden CTRs</strong></li>
@@ -568,48 +858,23 @@ def render_game_tab():
     
     # Initialize game state
     if "game_state" not in st.session_state:
-        # Generate random CTRs for the game (hidden from user!)
-        true_ctrs_game = sorted(np.random.uniform(0.05, 0.30, 3).tolist())
-        
-        st.session_state.game_state = {
-            "round": 0,
-            "max_rounds": 30,
-            "true_ctrs": true_ctrs_game,  # HIDDEN!
-            "c_param": 2.0,
-            "user_clicks": 0,
-            "ucb_clicks": 0,
-            "ucb_agent": UCBAgent(3, 2.0),
-            "user_Q": np.zeros(3),
-            "user_N": np.zeros(3),
-            "history": [],
-            "game_over": False
-        }
+        st.session_state.game_state = _new_game_state(_session_rng())
     
     game = st.session_state.game_state
+    # Click totals are derived from the reward bitmaps (unplayed rounds are False)
+    user_clicks = int(game["user_rewards"].sum())
+    ucb_clicks = int(game["ucb_rewards"].sum())
     
     # Settings sidebar for game
     with st.sidebar:
         st.markdown("### 🎮 Game Settings")
         if st.button("🎲 New Game"):
             # Reset with new random CTRs
-            true_ctrs_game = sorted(np.random.uniform(0.05, 0.30, 3).tolist())
-            st.session_state.game_state = {
-                "round": 0,
-                "max_rounds": 30,
-                "true_ctrs": true_ctrs_game,
-                "c_param": 2.0,
-                "user_clicks": 0,
-                "ucb_clicks": 0,
-                "ucb_agent": UCBAgent(3, 2.0),
-                "user_Q": np.zeros(3),
-                "user_N": np.zeros(3),
-                "history": [],
-                "game_over": False
-            }
+            st.session_state.game_state = _new_game_state(_session_rng())
             st.rerun()
     
     # Display scores
-    render_game_scores(game["user_clicks"], game["ucb_clicks"], game["round"])
+    render_game_scores(user_clicks, ucb_clicks, game["round"])
     
     st.markdown(f"### Round {game['round']}/{game['max_rounds']}")
     
@@ -636,30 +901,29 @@ def render_game_tab():
         
         # Process round if user made a choice
         if user_choice is not None:
-            game["round"] += 1
+            t = game["round"]
+            game["round"] = t + 1
+            coins = game["coins"][t]
+            ctrs = game["true_ctrs"]
+            user_Q, user_N = game["user_Q"], game["user_N"]
+            agent = game["ucb_agent"]
             
             # User's turn
-            user_reward = int(np.random.rand() < game["true_ctrs"][user_choice])
-            game["user_clicks"] += user_reward
-            game["user_N"][user_choice] += 1
-            game["user_Q"][user_choice] += (user_reward - game["user_Q"][user_choice]) / game["user_N"][user_choice]
+            user_reward = bool(coins[0] < ctrs[user_choice])
+            n = user_N[user_choice] + 1
+            user_N[user_choice] = n
+            user_Q[user_choice] += (user_reward - user_Q[user_choice]) / n
             
             # UCB's turn
-            ucb_choice = game["ucb_agent"].select_action()
-            ucb_reward = int(np.random.rand() < game["true_ctrs"][ucb_choice])
-            game["ucb_clicks"] += ucb_reward
-            game["ucb_agent"].update(ucb_choice, ucb_reward)
+            ucb_choice = agent.select_action()
+            ucb_reward = bool(coins[1] < ctrs[ucb_choice])
+            agent.update(ucb_choice, ucb_reward)
             
             # Record history
-            game["history"].append({
-                "round": game["round"],
-                "user_choice": user_choice,
-                "user_reward": user_reward,
-                "user_Q": game["user_Q"].copy(),
-                "ucb_choice": ucb_choice,
-                "ucb_reward": ucb_reward,
-                "ucb_Q": game["ucb_agent"].Q.copy()
-            })
+            game["user_actions"][t] = user_choice
+            game["user_rewards"][t] = user_reward
+            game["ucb_actions"][t] = ucb_choice
+            game["ucb_rewards"][t] = ucb_reward
             
             # Check if game over
             if game["round"] >= game["max_rounds"]:
@@ -677,7 +941,7 @@ def render_game_tab():
                     st.metric(
                         f"Ad {i+1}",
                         f"{game['user_Q'][i]:.3f}",
-                        f"({int(game['user_N'][i])} tries)"
+                        f"({game['user_N'][i]} tries)"
                     )
                 else:
                     st.metric(f"Ad {i+1}", "???", "(not tried)")
@@ -690,24 +954,24 @@ def render_game_tab():
         st.markdown("## 🏁 Game Over!")
         
         # Determine winner
-        if game["user_clicks"] > game["ucb_clicks"]:
+        if user_clicks > ucb_clicks:
             st.balloons()
             st.markdown("""
-            <div class='success-box'>
+            <div class='box success-box'>
             <h2>🎉 YOU WIN!</h2>
             <p>Your intuition beat the UCB algorithm!</p>
             </div>
             """, unsafe_allow_html=True)
-        elif game["user_clicks"] < game["ucb_clicks"]:
+        elif user_clicks < ucb_clicks:
             st.markdown("""
-            <div class='warning-box'>
+            <div class='box warning-box'>
             <h2>🤖 UCB WINS!</h2>
             <p>The algorithm outperformed human intuition!</p>
             </div>
             """, unsafe_allow_html=True)
         else:
             st.markdown("""
-            <div class='info-box'>
+            <div class='box info-box'>
             <h2>🤝 IT'S A TIE!</h2>
             <p>You matched the algorithm's performance!</p>
             </div>
@@ -727,35 +991,20 @@ def render_game_tab():
                 )
         
         # Show game history
-        if game["history"]:
+        if game["round"] > 0:
             st.markdown("### 📜 Game History")
-            history_df = pd.DataFrame([
-                {
-                    "Round": h["round"],
-                    "Your Choice": f"Ad {h['user_choice']+1}",
-                    "Your Result": "✅" if h["user_reward"] else "❌",
-                    "UCB Choice": f"Ad {h['ucb_choice']+1}",
-                    "UCB Result": "✅" if h["ucb_reward"] else "❌",
-                }
-                for h in game["history"]
-            ])
+            n = game["round"]
+            history_df = pd.DataFrame({
+                "Round": np.arange(1, n + 1),
+                "Your Choice": np.char.add("Ad ", (game["user_actions"][:n] + 1).astype(str)),
+                "Your Result": np.where(game["user_rewards"][:n], "✅", "❌"),
+                "UCB Choice": np.char.add("Ad ", (game["ucb_actions"][:n] + 1).astype(str)),
+                "UCB Result": np.where(game["ucb_rewards"][:n], "✅", "❌"),
+            })
             st.dataframe(history_df, use_container_width=True)
         
         st.markdown("---")
         if st.button("🎲 Play Again", type="primary"):
             # Reset with new random CTRs
-            true_ctrs_game = sorted(np.random.uniform(0.05, 0.30, 3).tolist())
-            st.session_state.game_state = {
-                "round": 0,
-                "max_rounds": 30,
-                "true_ctrs": true_ctrs_game,
-                "c_param": 2.0,
-                "user_clicks": 0,
-                "ucb_clicks": 0,
-                "ucb_agent": UCBAgent(3, 2.0),
-                "user_Q": np.zeros(3),
-                "user_N": np.zeros(3),
-                "history": [],
-                "game_over": False
-            }
+            st.session_state.game_state = _new_game_state(_session_rng())
             st.rerun()
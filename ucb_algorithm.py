@@ -3,9 +3,14 @@ UCB Algorithm Implementation
 Contains core UCB logic and simulation functions
 """
 
+import functools
+import math
+
 import numpy as np
 from typing import List, Tuple, Optional
 
+from ucb_core import ucb_values, select_arm, run_ucb_batch, run_ucb_grid, run_episode, play_rounds
+
 
 class UCBAgent:
     """Upper Confidence Bound agent for multi-armed bandit problems"""
@@ -20,9 +25,19 @@ class UCBAgent:
         """
         self.n_arms = n_arms
         self.c = c
-        self.Q = np.zeros(n_arms)  # Estimated values
-        self.N = np.zeros(n_arms)  # Selection counts
+        # Q and N share one contiguous block: row 0 estimates, row 1 counts
+        self._state = np.zeros((2, n_arms))
         self.t = 0  # Time step
+    
+    @property
+    def Q(self) -> np.ndarray:
+        """Estimated values (a view into the state block)"""
+        return self._state[0]
+    
+    @property
+    def N(self) -> np.ndarray:
+        """Selection counts (a view into the state block)"""
+        return self._state[1]
         
     def select_action(self) -> int:
         """
@@ -32,17 +47,7 @@ class UCBAgent:
             Selected action index
         """
         self.t += 1
-        
-        # Compute UCB values
-        ucb_values = np.zeros(self.n_arms)
-        for a in range(self.n_arms):
-            if self.N[a] == 0:
-                ucb_values[a] = float('inf')
-            else:
-                exploration_bonus = self.c * np.sqrt(np.log(self.t) / self.N[a])
-                ucb_values[a] = self.Q[a] + exploration_bonus
-        
-        return int(np.argmax(ucb_values))
+        return select_arm(self.Q, self.N, float(self.c), self.t)
     
     def update(self, action: int, reward: float) -> None:
         """
@@ -52,23 +57,18 @@ class UCBAgent:
             action: Action taken
             reward: Observed reward
         """
-        self.N[action] += 1
-        self.Q[action] += (reward - self.Q[action]) / self.N[action]
+        Q, N = self._state
+        N[action] += 1
+        Q[action] += (reward - Q[action]) / N[action]
     
     def get_ucb_values(self) -> np.ndarray:
         """Get current UCB values for all actions"""
-        ucb_values = np.zeros(self.n_arms)
-        for a in range(self.n_arms):
-            if self.N[a] == 0:
-                ucb_values[a] = float('inf')
-            else:
-                ucb_values[a] = self.Q[a] + self.c * np.sqrt(np.log(self.t) / self.N[a])
-        return ucb_values
+        log_t = math.log(self.t) if self.t > 0 else 0.0
+        return ucb_values(self.Q, self.N, log_t, self.c)
     
     def reset(self) -> None:
         """Reset agent state"""
-        self.Q = np.zeros(self.n_arms)
-        self.N = np.zeros(self.n_arms)
+        self._state.fill(0)
         self.t = 0
 
 
@@ -76,7 +76,8 @@ def simulate_ucb_episode(
     true_ctrs: List[float],
     n_rounds: int,
     c: float,
-    return_trajectory: bool = False
+    return_trajectory: bool = False,
+    rng: Optional[np.random.Generator] = None
 ) -> Tuple[float, Optional[np.ndarray]]:
     """
     Simulate a complete UCB episode
@@ -86,38 +87,52 @@ def simulate_ucb_episode(
         n_rounds: Number of rounds to simulate
         c: Exploration parameter
         return_trajectory: If True, return CTR at each round
+        rng: Random generator (a fresh one if None)
         
     Returns:
         Average CTR and optionally trajectory over time
     """
-    agent = UCBAgent(len(true_ctrs), c)
-    
-    total_clicks = 0
-    trajectory = [] if return_trajectory else None
+    rng = rng if rng is not None else np.random.default_rng()
+    trajectory = np.empty(n_rounds) if return_trajectory else None
+    clicks, _, _ = run_episode(true_ctrs, c, rng.random(n_rounds), trajectory)
+    return clicks / n_rounds, trajectory
+
+
+def advance_agent(
+    agent: UCBAgent,
+    true_ctrs: List[float],
+    n_rounds: int,
+    rng: Optional[np.random.Generator] = None,
+    coins: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Advance an agent by several rounds in one compiled call
     
-    for t in range(n_rounds):
-        action = agent.select_action()
-        reward = int(np.random.rand() < true_ctrs[action])
-        agent.update(action, reward)
-        
-        total_clicks += reward
+    Args:
+        agent: Agent to advance (its state is updated in place)
+        true_ctrs: True click-through rates for each ad
+        n_rounds: Number of rounds to play
+        rng: Random generator (a fresh one if None)
+        coins: Pre-drawn uniforms in [0, 1), one per round (drawn from
+            rng if None)
         
-        if return_trajectory:
-            trajectory.append(total_clicks / (t + 1))
-    
-    avg_ctr = total_clicks / n_rounds
-    
-    if return_trajectory:
-        return avg_ctr, np.array(trajectory)
-    else:
-        return avg_ctr, None
+    Returns:
+        Actions and rewards of each round played
+    """
+    if coins is None:
+        rng = rng if rng is not None else np.random.default_rng()
+        coins = rng.random(n_rounds)
+    actions, rewards = play_rounds(true_ctrs, agent.c, agent.Q, agent.N, agent.t, coins)
+    agent.t += n_rounds
+    return actions, rewards
 
 
 def run_multiple_simulations(
     true_ctrs: List[float],
     n_rounds: int,
     c_values: List[float],
-    n_runs: int = 30
+    n_runs: int = 30,
+    rng: Optional[np.random.Generator] = None
 ) -> dict:
     """
     Run multiple simulations for different c values
@@ -127,20 +142,56 @@ def run_multiple_simulations(
         n_rounds: Rounds per simulation
         c_values: List of c values to test
         n_runs: Number of runs per c value
+        rng: Random generator the kernel seed is drawn from (a fresh one if None)
         
     Returns:
         Dictionary mapping c values to lists of average CTRs
     """
-    results = {c: [] for c in c_values}
+    rng = rng if rng is not None else np.random.default_rng()
     
-    for c in c_values:
-        for _ in range(n_runs):
-            avg_ctr, _ = simulate_ucb_episode(true_ctrs, n_rounds, c)
-            results[c].append(avg_ctr)
+    # All (c, run) episodes share one parallel launch; only averages come back
+    avg_ctrs = run_ucb_grid(true_ctrs, n_rounds, c_values, n_runs, int(rng.integers(2**31)))
+    return {c: row.tolist() for c, row in zip(c_values, avg_ctrs)}
+
+
+def run_multiple_simulations_batched(
+    true_ctrs: List[float],
+    n_rounds: int,
+    c_values: List[float],
+    n_runs: int,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Run multiple simulations for different c values, keeping trajectories
     
-    return results
+    Args:
+        true_ctrs: True CTRs for each ad
+        n_rounds: Rounds per simulation
+        c_values: List of c values to test
+        n_runs: Number of runs per c value
+        rng: Random generator (a fresh one if None)
+        
+    Returns:
+        Running average CTR (float32) of shape (len(c_values), n_runs, n_rounds)
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    trajectories = np.empty((len(c_values), n_runs, n_rounds), dtype=np.float32)
+    rounds = np.arange(1, n_rounds + 1)
+    
+    # Running sums stay exact in int32; only the averages are stored as float32
+    for i, c in enumerate(c_values):
+        _, rewards = run_ucb_batch(true_ctrs, c, rng.random((n_runs, n_rounds)))
+        trajectories[i] = np.cumsum(rewards, axis=1, dtype=np.int32) / rounds
+    
+    return trajectories
+
+
+@functools.lru_cache(maxsize=32)
+def _optimal_ctr(true_ctrs: Tuple[float, ...]) -> float:
+    """Best CTR of a hashable CTR tuple (memoized across reruns)"""
+    return max(true_ctrs)
 
 
 def get_optimal_ctr(true_ctrs: List[float]) -> float:
     """Get the optimal CTR (always choosing best ad)"""
-    return max(true_ctrs)
+    return _optimal_ctr(tuple(map(float, true_ctrs)))
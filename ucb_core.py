@@ -0,0 +1,380 @@
+"""
+UCB Core Kernels
+Numba-compiled simulation loops backing the UCB algorithm module
+"""
+
+import functools
+import math
+import threading
+
+import numpy as np
+from numba import config, float64, get_num_threads, njit, prange, vectorize
+from typing import Optional, Tuple
+
+
+# Streamlit runs scripts on worker threads: TBB hangs interpreter shutdown
+# once a kernel has been launched off the main thread, and workqueue does
+# not allow concurrent launches, hence the layer order and the lock
+config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+_PARALLEL_LOCK = threading.Lock()
+
+
+@njit(inline="always")
+def _count_tables(n):
+    # Per-count lookups replacing the divides, sqrts and logs of the hot loop:
+    # 1/n for the mean update, 1/sqrt(n) and sqrt(log t) for the UCB bonus
+    counts = np.arange(1, n + 1).astype(np.float64)
+    return 1.0 / counts, 1.0 / np.sqrt(counts), np.sqrt(np.log(counts))
+
+
+@njit(inline="always")
+def _select_arm(Q, N, k, bonus_scale, inv_sqrt_n):
+    # Untried arms are selected first; otherwise take the largest
+    # Q + c * sqrt(log t) / sqrt(N), with bonus_scale = c * sqrt(log t).
+    # The running best is seeded from arm 0 rather than -inf: this is
+    # inlined into fastmath kernels, where comparing against inf is undefined
+    action = 0
+    best = 0.0
+    for a in range(k):
+        if N[a] == 0:
+            return a
+        value = Q[a] + bonus_scale * inv_sqrt_n[int(N[a]) - 1]
+        if a == 0 or value > best:
+            best = value
+            action = a
+    return action
+
+
+@vectorize([float64(float64, float64, float64, float64)], cache=True)
+def ucb_values(Q, N, log_t, c):
+    """UCB value of one arm; broadcasts over arrays (inf for untried arms)"""
+    if N > 0:
+        return Q + c * math.sqrt(log_t / N)
+    return math.inf
+
+
+@njit(cache=True)
+def select_arm(Q: np.ndarray, N: np.ndarray, c: float, t: int) -> int:
+    """
+    Pick the UCB arm in a single scan, without building the UCB vector
+
+    Args:
+        Q: Estimated values
+        N: Selection counts
+        c: Exploration parameter
+        t: Current time step (at least 1)
+
+    Returns:
+        First untried arm, otherwise the arm with the largest UCB value
+    """
+    # Same expression as UCBAgent.get_ucb_values, so the pick matches
+    # the values shown in the UI bit for bit
+    log_t = math.log(t)
+    action = 0
+    best = -math.inf
+    for a in range(Q.shape[0]):
+        if N[a] == 0:
+            return a
+        value = Q[a] + c * math.sqrt(log_t / N[a])
+        if value > best:
+            best = value
+            action = a
+    return action
+
+
+# Arm counts that get kernels with the arm scan unrolled at compile time
+SPECIALIZED_ARMS = (2, 3, 4, 5)
+
+
+def _make_kernels(n_arms: int) -> dict:
+    """
+    Build the simulation kernels for a fixed number of arms
+    
+    With n_arms a compile-time constant LLVM fully unrolls the arm scan;
+    n_arms=0 builds the generic kernels that read it from true_ctrs.
+    """
+    @njit(parallel=True, fastmath=True, cache=True)
+    def run_batch(true_ctrs, c, coins):
+        k = n_arms if n_arms > 0 else true_ctrs.shape[0]
+        n_seeds, n_rounds = coins.shape
+        actions = np.empty((n_seeds, n_rounds), dtype=np.int32)
+        rewards = np.empty((n_seeds, n_rounds), dtype=np.int8)
+        # Lookup tables are shared read-only by every episode; counts stay
+        # integer since they only ever index those tables
+        inv_n, inv_sqrt_n, sqrt_log_t = _count_tables(n_rounds)
+
+        for s in prange(n_seeds):
+            Q = np.zeros(k)
+            N = np.zeros(k, dtype=np.int64)
+
+            for t in range(n_rounds):
+                action = _select_arm(Q, N, k, c * sqrt_log_t[t], inv_sqrt_n)
+
+                reward = 1 if coins[s, t] < true_ctrs[action] else 0
+                N[action] += 1
+                Q[action] += (reward - Q[action]) * inv_n[N[action] - 1]
+
+                actions[s, t] = action
+                rewards[s, t] = reward
+
+        return actions, rewards
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def run_grid(true_ctrs, n_rounds, c_arr, n_runs, seed, n_chunks, out):
+        k = n_arms if n_arms > 0 else true_ctrs.shape[0]
+        inv_n, inv_sqrt_n, sqrt_log_t = _count_tables(n_rounds)
+
+        n_total = c_arr.shape[0] * n_runs
+        n_chunks = min(n_chunks, n_total)
+
+        # Each chunk owns one Q/N pair and zeroes it between its episodes
+        for j in prange(n_chunks):
+            Q = np.empty(k)
+            N = np.empty(k, dtype=np.int64)
+
+            for i in range(j * n_total // n_chunks, (j + 1) * n_total // n_chunks):
+                c = c_arr[i // n_runs]
+                # numba keeps one generator per thread, so reseeding per episode
+                # makes each result independent of how episodes are scheduled
+                np.random.seed(seed + i)
+                Q[:] = 0.0
+                N[:] = 0
+                clicks = 0.0
+
+                for t in range(n_rounds):
+                    action = _select_arm(Q, N, k, c * sqrt_log_t[t], inv_sqrt_n)
+
+                    reward = 1.0 if np.random.random() < true_ctrs[action] else 0.0
+                    N[action] += 1
+                    Q[action] += (reward - Q[action]) * inv_n[N[action] - 1]
+                    clicks += reward
+
+                out[i // n_runs, i % n_runs] = clicks / n_rounds
+
+    @njit(fastmath=True, cache=True)
+    def run_episode_(true_ctrs, c, coins, trajectory):
+        k = n_arms if n_arms > 0 else true_ctrs.shape[0]
+        n_rounds = coins.shape[0]
+        record = trajectory.shape[0] > 0
+        inv_n, inv_sqrt_n, sqrt_log_t = _count_tables(n_rounds)
+        Q = np.zeros(k)
+        N = np.zeros(k, dtype=np.int64)
+        clicks = 0.0
+
+        for t in range(n_rounds):
+            action = _select_arm(Q, N, k, c * sqrt_log_t[t], inv_sqrt_n)
+
+            reward = 1.0 if coins[t] < true_ctrs[action] else 0.0
+            N[action] += 1
+            Q[action] += (reward - Q[action]) * inv_n[N[action] - 1]
+
+            clicks += reward
+            if record:
+                trajectory[t] = clicks / (t + 1)
+
+        return clicks, Q, N
+
+    @njit(cache=True)
+    def play_rounds_(true_ctrs, c, Q, N, t0, coins):
+        # The caller's buffers bound the scan, not the CTR list
+        k = n_arms if n_arms > 0 else Q.shape[0]
+        n_steps = coins.shape[0]
+        actions = np.empty(n_steps, dtype=np.int32)
+        rewards = np.empty(n_steps, dtype=np.int8)
+        inv_n, inv_sqrt_n, sqrt_log_t = _count_tables(t0 + n_steps)
+
+        for i in range(n_steps):
+            action = _select_arm(Q, N, k, c * sqrt_log_t[t0 + i], inv_sqrt_n)
+
+            reward = 1 if coins[i] < true_ctrs[action] else 0
+            N[action] += 1
+            Q[action] += (reward - Q[action]) * inv_n[int(N[action]) - 1]
+
+            actions[i] = action
+            rewards[i] = reward
+
+        return actions, rewards
+
+    return {
+        "batch": run_batch,
+        "grid": run_grid,
+        "episode": run_episode_,
+        "play_rounds": play_rounds_
+    }
+
+
+_GENERIC_KERNELS = _make_kernels(0)
+_SPECIALIZED_KERNELS = {k: _make_kernels(k) for k in SPECIALIZED_ARMS}
+
+
+def _kernels(n_arms: int) -> dict:
+    """Kernels unrolled for n_arms if available, else the generic ones"""
+    return _SPECIALIZED_KERNELS.get(n_arms, _GENERIC_KERNELS)
+
+
+def run_ucb_batch(
+    true_ctrs: np.ndarray,
+    c: float,
+    coins: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run independent UCB episodes in parallel
+
+    Args:
+        true_ctrs: True CTRs for each ad
+        c: Exploration parameter
+        coins: Uniform draws in [0, 1) of shape (n_seeds, n_rounds),
+            one row per episode
+
+    Returns:
+        Chosen arms (int32) and rewards (int8), each of shape (n_seeds, n_rounds)
+    """
+    true_ctrs = np.asarray(true_ctrs, dtype=np.float64)
+    with _PARALLEL_LOCK:
+        return _kernels(true_ctrs.shape[0])["batch"](true_ctrs, float(c), coins)
+
+
+# Sweeps at least this large go to the GPU when one is available
+CUDA_MIN_EPISODES = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def _cuda_grid():
+    """
+    GPU grid runner if a CUDA device is usable, else None
+    
+    ucb_cuda is imported lazily so CPU-only installs never load numba.cuda.
+    """
+    try:
+        import ucb_cuda
+    except Exception:
+        return None
+    return ucb_cuda if ucb_cuda.cuda.is_available() else None
+
+
+def run_ucb_grid(
+    true_ctrs: np.ndarray,
+    n_rounds: int,
+    c_values: np.ndarray,
+    n_runs: int,
+    seed: int
+) -> np.ndarray:
+    """
+    Run n_runs UCB episodes for every c value in parallel, keeping only averages
+
+    Episodes draw from numba's generator seeded with seed + episode index,
+    so no reward matrix is materialized. Sweeps of CUDA_MIN_EPISODES or more
+    run one episode per GPU thread when a CUDA device is available (with
+    per-thread xoroshiro128+ streams, so results differ from the CPU path).
+
+    Args:
+        true_ctrs: True CTRs for each ad
+        n_rounds: Rounds per episode
+        c_values: Exploration parameters to test
+        n_runs: Episodes per c value
+        seed: Base seed
+
+    Returns:
+        Average CTR of each episode, shape (len(c_values), n_runs)
+    """
+    true_ctrs = np.asarray(true_ctrs, dtype=np.float64)
+    c_arr = np.asarray(c_values, dtype=np.float64)
+    avg_ctrs = np.empty((c_arr.shape[0], int(n_runs)))
+    
+    if c_arr.shape[0] * int(n_runs) >= CUDA_MIN_EPISODES:
+        gpu = _cuda_grid()
+        if gpu is not None and true_ctrs.shape[0] <= gpu.MAX_ARMS:
+            gpu.run_ucb_grid(true_ctrs, int(n_rounds), c_arr, int(n_runs), int(seed), avg_ctrs)
+            return avg_ctrs
+    
+    with _PARALLEL_LOCK:
+        _kernels(true_ctrs.shape[0])["grid"](
+            true_ctrs, int(n_rounds), c_arr, int(n_runs), int(seed),
+            get_num_threads(), avg_ctrs
+        )
+    return avg_ctrs
+
+
+# Zero-length stand-in for "no trajectory", so the kernel keeps one signature
+_NO_TRAJECTORY = np.empty(0)
+
+
+def run_episode(
+    true_ctrs: np.ndarray,
+    c: float,
+    coins: np.ndarray,
+    trajectory: Optional[np.ndarray] = None
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Run a single UCB episode from scratch
+
+    Args:
+        true_ctrs: True CTRs for each ad
+        c: Exploration parameter
+        coins: Uniform draws in [0, 1), one per round
+        trajectory: Optional float64 buffer, one slot per round, filled
+            with the running average CTR
+
+    Returns:
+        Total clicks (as a float), and the final Q and N estimates
+    """
+    true_ctrs = np.asarray(true_ctrs, dtype=np.float64)
+    if trajectory is None:
+        trajectory = _NO_TRAJECTORY
+    return _kernels(true_ctrs.shape[0])["episode"](true_ctrs, float(c), coins, trajectory)
+
+
+def play_rounds(
+    true_ctrs: np.ndarray,
+    c: float,
+    Q: np.ndarray,
+    N: np.ndarray,
+    t0: int,
+    coins: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Continue a single UCB episode
+    
+    Q and N are updated in place.
+    
+    Args:
+        true_ctrs: True CTRs for each ad
+        c: Exploration parameter
+        Q: Estimated values (float64, updated in place)
+        N: Selection counts (float64, updated in place)
+        t0: Number of rounds already played
+        coins: Uniform draws in [0, 1), one per round to play
+        
+    Returns:
+        Chosen arms (int32) and rewards (int8), each of shape (n_steps,)
+        
+    Raises:
+        ValueError: If true_ctrs, Q and N do not all have the same length
+    """
+    true_ctrs = np.asarray(true_ctrs, dtype=np.float64)
+    # The kernel does no bounds checking, so a mismatch would write past Q and N
+    if not true_ctrs.shape[0] == Q.shape[0] == N.shape[0]:
+        raise ValueError(
+            f"true_ctrs has {true_ctrs.shape[0]} arms but Q and N have "
+            f"{Q.shape[0]} and {N.shape[0]}"
+        )
+    return _kernels(Q.shape[0])["play_rounds"](true_ctrs, float(c), Q, N, int(t0), coins)
+
+
+def warmup_kernels(n_arms: int = 2) -> None:
+    """
+    Compile the kernels so the first simulation doesn't pay the JIT cost
+    
+    Goes through the public wrappers, which coerce arguments to the
+    production types, so the compiled specialization is the one reused.
+    
+    Args:
+        n_arms: Arm count whose kernels to compile
+    """
+    ctrs = np.linspace(0.1, 0.2, n_arms)
+    zeros = np.zeros(n_arms)
+    select_arm(zeros, zeros, 2.0, 1)
+    run_ucb_batch(ctrs, 2.0, np.full((1, 8), 0.5))
+    run_ucb_grid(ctrs, 8, np.array([2.0]), 1, 0)
+    run_episode(ctrs, 2.0, np.full(8, 0.5), np.empty(8))
+    play_rounds(ctrs, 2.0, np.zeros(n_arms), np.zeros(n_arms), 0, np.full(8, 0.5))
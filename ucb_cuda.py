@@ -0,0 +1,82 @@
+"""
+UCB CUDA Kernels
+GPU variant of the parameter-sweep kernel for very large sweeps
+"""
+
+import math
+
+import numpy as np
+from numba import cuda
+from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float64
+
+
+# Per-thread Q/N live in fixed-size local arrays
+MAX_ARMS = 32
+THREADS_PER_BLOCK = 256
+
+
+@cuda.jit
+def _grid_kernel(true_ctrs, n_rounds, c_arr, n_runs, rng_states, out):
+    # One thread plays one (c, run) episode end to end
+    i = cuda.grid(1)
+    if i >= c_arr.shape[0] * n_runs:
+        return
+    k = true_ctrs.shape[0]
+    c = c_arr[i // n_runs]
+    Q = cuda.local.array(MAX_ARMS, np.float64)
+    N = cuda.local.array(MAX_ARMS, np.int64)
+    for a in range(k):
+        Q[a] = 0.0
+        N[a] = 0
+    clicks = 0.0
+
+    for t in range(n_rounds):
+        # Untried arms are selected first; otherwise take the largest UCB
+        bonus_scale = c * math.sqrt(math.log(t + 1.0))
+        action = 0
+        best = -math.inf
+        for a in range(k):
+            if N[a] == 0:
+                action = a
+                break
+            value = Q[a] + bonus_scale / math.sqrt(N[a])
+            if value > best:
+                best = value
+                action = a
+
+        u = xoroshiro128p_uniform_float64(rng_states, i)
+        reward = 1.0 if u < true_ctrs[action] else 0.0
+        N[action] += 1
+        Q[action] += (reward - Q[action]) / N[action]
+        clicks += reward
+
+    out[i // n_runs, i % n_runs] = clicks / n_rounds
+
+
+def run_ucb_grid(
+    true_ctrs: np.ndarray,
+    n_rounds: int,
+    c_arr: np.ndarray,
+    n_runs: int,
+    seed: int,
+    out: np.ndarray
+) -> None:
+    """
+    Run n_runs UCB episodes for every c value, one episode per GPU thread
+    
+    Args:
+        true_ctrs: True CTRs for each ad (float64, at most MAX_ARMS)
+        n_rounds: Rounds per episode
+        c_arr: Exploration parameters (float64)
+        n_runs: Episodes per c value
+        seed: Seed for the per-thread xoroshiro128+ streams
+        out: Host array of shape (len(c_arr), n_runs) receiving average CTRs
+    """
+    n_episodes = c_arr.shape[0] * n_runs
+    rng_states = create_xoroshiro128p_states(n_episodes, seed=seed)
+    d_out = cuda.device_array(out.shape, dtype=np.float64)
+    blocks = (n_episodes + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    _grid_kernel[blocks, THREADS_PER_BLOCK](
+        cuda.to_device(true_ctrs), n_rounds, cuda.to_device(c_arr), n_runs, rng_states, d_out
+    )
+    d_out.copy_to_host(out)
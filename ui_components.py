@@ -5,8 +5,8 @@ Reusable UI elements for the UCB Tutorial app
 
 import streamlit as st
 import numpy as np
-from typing import List, Optional
-from config import APP_CONFIG, DEFAULT_PARAMS
+from typing import List, Optional, Tuple
+from config import APP_CONFIG, DEFAULT_PARAMS, CHART_ENGINES
 
 
 def setup_page():
@@ -19,6 +19,56 @@ def setup_page():
     )
 
 
+# Session-state keys and initial values of the sidebar widgets
+SIDEBAR_DEFAULTS = {
+    "sidebar_true_ctrs": ",".join(map(str, DEFAULT_PARAMS["true_ctrs"])),
+    "sidebar_n_rounds": DEFAULT_PARAMS["n_rounds"],
+    "sidebar_renderer": DEFAULT_PARAMS["renderer"],
+}
+
+
+def keep_sidebar_state():
+    """
+    Preserve sidebar widget values across reruns where the sidebar is not drawn
+    
+    Streamlit drops the state of widgets that are not rendered in a run;
+    re-assigning the keys detaches them from that clean-up.
+    """
+    for key, default in SIDEBAR_DEFAULTS.items():
+        st.session_state[key] = st.session_state.get(key, default)
+
+
+# Session-state keys of the tab-local widgets. Their defaults can depend on
+# the sidebar settings, so each tab seeds them the first time it is drawn
+TAB_WIDGET_KEYS = (
+    "primer_true_ctr", "primer_n_impressions",
+    "visual_n_rounds", "visual_c",
+    "comparison_n_rounds", "comparison_c_values", "comparison_n_runs", "comparison_seed",
+    "stat_n_rounds", "stat_c_values", "stat_n_runs", "stat_alpha", "stat_seed",
+)
+
+
+def keep_tab_state():
+    """
+    Preserve tab-local widget values while another tab is active
+    
+    Only the active tab is drawn, so the same clean-up as for the sidebar
+    would otherwise reset a tab's inputs while its results stay on screen.
+    """
+    for key in TAB_WIDGET_KEYS:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+@st.cache_data(show_spinner=False)
+def _parse_ctrs(text: str) -> np.ndarray:
+    """Parse a comma-separated list of CTRs (cached on the raw input text)"""
+    return np.array(
+        [float(x.strip()) for x in text.split(",") if x.strip()],
+        dtype=np.float64
+    )
+
+
 def render_sidebar() -> dict:
     """
     Render sidebar with global settings
@@ -31,12 +81,12 @@ def render_sidebar() -> dict:
     # True CTRs input
     true_ctrs_input = st.sidebar.text_input(
         "True CTRs (comma-separated)",
-        ",".join(map(str, DEFAULT_PARAMS["true_ctrs"])),
-        help="Click-through rates for each ad. These represent the true probabilities."
+        help="Click-through rates for each ad. These represent the true probabilities.",
+        key="sidebar_true_ctrs"
     )
     
     try:
-        true_ctrs = [float(x.strip()) for x in true_ctrs_input.split(",") if x.strip()]
+        true_ctrs = _parse_ctrs(true_ctrs_input)
         if len(true_ctrs) < 2:
             st.sidebar.error("⚠️ Provide at least two CTRs")
             true_ctrs = DEFAULT_PARAMS["true_ctrs"]
@@ -49,9 +99,18 @@ def render_sidebar() -> dict:
         "Default rounds per simulation",
         min_value=DEFAULT_PARAMS["min_rounds"],
         max_value=DEFAULT_PARAMS["max_rounds"],
-        value=DEFAULT_PARAMS["n_rounds"],
         step=50,
-        help="Number of user visits (impressions) in each simulation"
+        help="Number of user visits (impressions) in each simulation",
+        key="sidebar_n_rounds"
+    )
+    
+    # Chart engine
+    renderer = st.sidebar.selectbox(
+        "Chart engine",
+        list(CHART_ENGINES),
+        format_func=CHART_ENGINES.get,
+        help="Raw Vega-Lite specs skip Altair's object model and render faster",
+        key="sidebar_renderer"
     )
     
     st.sidebar.markdown("---")
@@ -72,10 +131,41 @@ def render_sidebar() -> dict:
     
     return {
         "true_ctrs": true_ctrs,
-        "n_rounds": n_rounds
+        "n_rounds": n_rounds,
+        "renderer": renderer
     }
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def _ad_row_html(
+    n_ads: int,
+    selected_ad: Optional[int],
+    reward: Optional[int],
+    labels: Optional[Tuple[str, ...]]
+) -> str:
+    """Build the HTML of the whole ad row (cached on the inputs)"""
+    boxes = []
+    
+    for i in range(n_ads):
+        label = labels[i] if labels else f"Ad {i+1}"
+        
+        if selected_ad is not None and i == selected_ad:
+            # Selected ad
+            reward_text = "✅ Click!" if reward == 1 else "❌ No Click"
+            boxes.append(
+                f"<div class='ad-box ad-box-selected'><h3>🟩 {label}</h3>"
+                f"<p><strong>Displayed</strong></p><p>{reward_text}</p></div>"
+            )
+        else:
+            # Idle ad
+            boxes.append(
+                f"<div class='ad-box ad-box-idle'><h3>⬜ {label}</h3><p>Idle</p></div>"
+            )
+    
+    # A single line, so markdown treats the row as one raw HTML block
+    return f"<div class='ad-row'>{''.join(boxes)}</div>"
+
+
 def render_ad_boxes(
     n_ads: int,
     selected_ad: Optional[int] = None,
@@ -91,36 +181,58 @@ def render_ad_boxes(
         reward: Reward received (1 for click, 0 for no click)
         labels: Optional custom labels for ads
     """
-    cols = st.columns(n_ads)
-    
-    for i, col in enumerate(cols):
-        with col:
-            label = labels[i] if labels else f"Ad {i+1}"
-            
-            if selected_ad is not None and i == selected_ad:
-                # Selected ad
-                reward_text = "✅ Click!" if reward == 1 else "❌ No Click"
-                col.markdown(
-                    f"""
-                    <div class='ad-box-selected'>
-                        <h3>🟩 {label}</h3>
-                        <p><strong>Displayed</strong></p>
-                        <p>{reward_text}</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-            else:
-                # Idle ad
-                col.markdown(
-                    f"""
-                    <div class='ad-box-idle'>
-                        <h3>⬜ {label}</h3>
-                        <p>Idle</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+    st.markdown(
+        _ad_row_html(
+            int(n_ads),
+            None if selected_ad is None else int(selected_ad),
+            None if reward is None else int(reward),
+            tuple(labels) if labels else None
+        ),
+        unsafe_allow_html=True
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _stats_panel_markdown(
+    round_num: int,
+    total_rounds: int,
+    avg_ctr: float,
+    Q: Tuple[float, ...],
+    N: Tuple[int, ...],
+    ucb_values: Optional[Tuple[float, ...]],
+    chosen_ad: Optional[int],
+    true_ctrs: Optional[Tuple[float, ...]]
+) -> Tuple[str, ...]:
+    """Build the markdown blocks of the statistics panel (cached on the inputs)"""
+    blocks = [
+        f"""
+        <div class='stats-panel'>
+        <h3>📊 Statistics</h3>
+        <p><strong>Round:</strong> {round_num}/{total_rounds}</p>
+        <p><strong>Average CTR:</strong> {avg_ctr:.4f}</p>
+        """
+    ]
+    
+    if chosen_ad is not None:
+        blocks.append(f"<p><strong>Selected:</strong> Ad {chosen_ad + 1}</p>")
+    
+    blocks.append("---")
+    blocks.append(f"**Estimated CTRs (Q):** {[round(q, 4) for q in Q]}")
+    blocks.append(f"**Selections (N):** {list(N)}")
+    
+    if ucb_values is not None:
+        # Format all values at once, then show untried ads as infinity
+        ucb_values = np.asarray(ucb_values, dtype=float)
+        mask = np.isinf(ucb_values)
+        ucb_display = np.char.mod("%.4f", np.where(mask, 0.0, ucb_values))
+        ucb_display[mask] = "∞"
+        blocks.append(f"**UCB Values:** {ucb_display.tolist()}")
+    
+    if true_ctrs is not None:
+        blocks.append(f"**True CTRs:** {np.char.mod('%.3f', true_ctrs).tolist()}")
+    
+    blocks.append("</div>")
+    return tuple(blocks)
 
 
 def render_stats_panel(
@@ -146,37 +258,19 @@ def render_stats_panel(
         chosen_ad: Currently chosen ad (optional)
         true_ctrs: True CTRs (optional, for debugging)
     """
-    st.markdown(
-        f"""
-        <div class='stats-panel'>
-        <h3>📊 Statistics</h3>
-        <p><strong>Round:</strong> {round_num}/{total_rounds}</p>
-        <p><strong>Average CTR:</strong> {avg_ctr:.4f}</p>
-        """,
-        unsafe_allow_html=True
+    blocks = _stats_panel_markdown(
+        int(round_num),
+        int(total_rounds),
+        float(avg_ctr),
+        tuple(np.asarray(Q, dtype=float).tolist()),
+        tuple(np.asarray(N).astype(int).tolist()),
+        None if ucb_values is None else tuple(np.asarray(ucb_values, dtype=float).tolist()),
+        None if chosen_ad is None else int(chosen_ad),
+        None if true_ctrs is None else tuple(map(float, true_ctrs))
     )
     
-    if chosen_ad is not None:
-        st.markdown(f"<p><strong>Selected:</strong> Ad {chosen_ad + 1}</p>", unsafe_allow_html=True)
-    
-    st.markdown("---")
-    st.markdown(f"**Estimated CTRs (Q):** {np.round(Q, 4).tolist()}")
-    st.markdown(f"**Selections (N):** {N.astype(int).tolist()}")
-    
-    if ucb_values is not None:
-        # Handle infinity values for display
-        ucb_display = []
-        for val in ucb_values:
-            if np.isinf(val):
-                ucb_display.append("∞")
-            else:
-                ucb_display.append(f"{val:.4f}")
-        st.markdown(f"**UCB Values:** {ucb_display}")
-    
-    if true_ctrs is not None:
-        st.markdown(f"**True CTRs:** {[f'{ctr:.3f}' for ctr in true_ctrs]}")
-    
-    st.markdown("</div>", unsafe_allow_html=True)
+    for block in blocks:
+        st.markdown(block, unsafe_allow_html=True)
 
 
 def render_formula_explanation():
@@ -206,7 +300,7 @@ def render_formula_explanation():
 def show_success_message(message: str):
     """Display success message with styling"""
     st.markdown(
-        f"<div class='success-box'>✅ {message}</div>",
+        f"<div class='box success-box'>✅ {message}</div>",
         unsafe_allow_html=True
     )
 
@@ -214,35 +308,39 @@ def show_success_message(message: str):
 def show_warning_message(message: str):
     """Display warning message with styling"""
     st.markdown(
-        f"<div class='warning-box'>⚠️ {message}</div>",
+        f"<div class='box warning-box'>⚠️ {message}</div>",
         unsafe_allow_html=True
     )
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def _game_scores_html(user_score: int, ucb_score: int, total_rounds: int) -> Tuple[str, str]:
+    """Build the HTML of both score cards (cached on the inputs)"""
+    return (
+        f"""
+        <div class='game-score user-score'>
+            <div>👤 Your Score</div>
+            <div style='font-size: 3rem;'>{user_score}</div>
+            <div>CTR: {user_score/max(total_rounds, 1):.3f}</div>
+        </div>
+        """,
+        f"""
+        <div class='game-score ucb-score'>
+            <div>🤖 UCB Score</div>
+            <div style='font-size: 3rem;'>{ucb_score}</div>
+            <div>CTR: {ucb_score/max(total_rounds, 1):.3f}</div>
+        </div>
+        """
+    )
+
+
 def render_game_scores(user_score: int, ucb_score: int, total_rounds: int):
     """Render game scores in a visual way"""
+    user_html, ucb_html = _game_scores_html(int(user_score), int(ucb_score), int(total_rounds))
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(
-            f"""
-            <div class='game-score user-score'>
-                <div>👤 Your Score</div>
-                <div style='font-size: 3rem;'>{user_score}</div>
-                <div>CTR: {user_score/max(total_rounds, 1):.3f}</div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        st.markdown(user_html, unsafe_allow_html=True)
     
     with col2:
-        st.markdown(
-            f"""
-            <div class='game-score ucb-score'>
-                <div>🤖 UCB Score</div>
-                <div style='font-size: 3rem;'>{ucb_score}</div>
-                <div>CTR: {ucb_score/max(total_rounds, 1):.3f}</div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        st.markdown(ucb_html, unsafe_allow_html=True)